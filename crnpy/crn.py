@@ -19,7 +19,8 @@ from .createmodel import model_from_reacts, model_from_sbml, replace_reacts
 from .matrixfunctions import negative, sdiag, print_matrix, _pos_dependent, _pos_generators
 from .crncomplex import Complex
 from .parsereaction import parse_reaction_file, parse_complex, parse_reactions, ast_to_sympy_expr, flux_value
-from .reaction import Reaction, _split_reaction_monom, merge_reactions, _same_denom
+from .reaction import Reaction, _split_reaction_monom, merge_reactions, _same_denom, _compile_exprs, \
+                      build_stoich_matrices
 
 __author__ = "Elisa Tonello"
 __copyright__ = "Copyright (c) 2016, Elisa Tonello"
@@ -327,6 +328,9 @@ class CRN(object):
         # Create the incidence matrix. c x r
         self._incidence_matrix = sp.SparseMatrix(self.n_complexes, self.n_reactions, incidence)
 
+        # Numerical reactant and product stoichiometries, built when first needed. s x r
+        self._sparse_stoich_matrices = None
+
 
     def update_model(self, if_exists = False):
         """Update the SBML model and document or create them if they do not exist.
@@ -447,6 +451,40 @@ class CRN(object):
         return sp.SparseMatrix(self.complex_matrix.multiply(self.incidence_matrix))
 
 
+    @property
+    def sparse_stoich_matrices(self):
+        """Reactant and product stoichiometric matrices, as scipy sparse matrices.
+
+        Each has dimension number of species times number of reactions,
+        see build_stoich_matrices.
+
+        :rtype: pair of scipy csr_matrix.
+        """
+        if self._sparse_stoich_matrices is None:
+            self._sparse_stoich_matrices = build_stoich_matrices(self.reactions, self.species)
+        return self._sparse_stoich_matrices
+
+
+    @property
+    def sparse_stoich_matrix(self):
+        """Stoichiometric matrix of the reaction network, as scipy sparse matrix.
+
+        :rtype: scipy csr_matrix.
+
+        :Example:
+
+        >>> from crnpy.crn import CRN, from_react_strings
+        >>> net = from_react_strings(["A1 ->(k1) A2 + A3", "A2 ->(k2) 2 A3"])
+        >>> net.sparse_stoich_matrix.toarray()
+        array([[-1,  0],
+               [ 1, -1],
+               [ 1,  2]])
+
+        """
+        s_in, s_out = self.sparse_stoich_matrices
+        return s_out - s_in
+
+
     @property
     def kinetic_matrix(self):
         """Kinetic matrix.
@@ -831,6 +869,27 @@ class CRN(object):
                 for j in range(self.n_species)]
 
 
+    def compile_rates(self, params = (), backend = "numpy"):
+        """Return a numerical function computing all the reaction rates at once.
+        The arguments of the function are the concentrations of the species,
+        in the order of self.species, followed by the values of params.
+        The function returns a tuple with one rate for each reaction.
+        By default the function is a plain lambdified function,
+        use backend = "numba" to compile it with numba (requires numba).
+
+        :Example:
+
+        >>> from crnpy.crn import from_react_strings
+        >>> net = from_react_strings(["a ->(k1) b", "b ->(k2) "])
+        >>> f = net.compile_rates(['k1', 'k2'])
+        >>> f(1., 2., 3., 4.)
+        (3.0, 8.0)
+
+        :rtype: function.
+        """
+        return _compile_exprs(list(self.species) + list(params), tuple(self.rates), backend)
+
+
     def format_equations(self):
         """Return strings representing the differential equations
         describing the evolution of the species concentrations."""
@@ -1315,8 +1374,8 @@ class CRN(object):
 
             # find expression for intermediate
             # (does not work in more general cases)
-            numer = sum([reaction.rate * reaction.product[intermediate] for reaction in reactReactions])
-            denom = sum([reaction.reactant[intermediate] * reaction.rate for reaction in prodReactions])
+            numer = sp.Add(*[reaction.rate * reaction.product[intermediate] for reaction in reactReactions])
+            denom = sp.Add(*[reaction.reactant[intermediate] * reaction.rate for reaction in prodReactions])
             expr = (y * numer / denom).cancel()
 
             def combine(r1, r2):
@@ -1324,8 +1383,8 @@ class CRN(object):
                 c = Complex(dict((k, d) for k, d in r1.product.items() if k != intermediate))
                 cprime = Complex(dict((k, d) for k, d in r2.reactant.items() if k != intermediate))
                 cprimeprime = c | cprime
-                newreactant = Complex(r1.reactant + cprimeprime - c)
-                newproduct = Complex(r2.product + cprimeprime - cprime)
+                newreactant = r1.reactant + cprimeprime - c
+                newproduct = r2.product + cprimeprime - cprime
                 return Reaction(newid, newreactant, newproduct, (r1.rate * r2.rate / denom).cancel())
 
             # create reactions by combining reactions
@@ -1425,7 +1484,7 @@ class CRN(object):
         else:
             if not no_rates:
                 if hasLinearDyn:
-                    denom = sum([reaction.reactant[intermediate] * reaction.rate for reaction in prodReactions])
+                    denom = sp.Add(*[reaction.reactant[intermediate] * reaction.rate for reaction in prodReactions])
                     expr = sp.solve(sp.ratsimp((self.stoich_matrix[self.species.index(intermediate), :] * self.rates)[0]).as_numer_denom()[0], y)[0]
                 else:
                     expr = sp.solve((self.stoich_matrix[self.species.index(intermediate), :] * self.rates)[0], y)[1]
@@ -1442,8 +1501,8 @@ class CRN(object):
                     hm = int(h / m)
                     cprimeprime = c.times(hn) | cprime.times(hm)
 
-                    newreactant = Complex(r1.reactant.times(hn) + cprimeprime - c.times(hn))
-                    newproduct = Complex(r2.product.times(hm) + cprimeprime - cprime.times(hm))
+                    newreactant = r1.reactant.times(hn) + cprimeprime - c.times(hn)
+                    newproduct = r2.product.times(hm) + cprimeprime - cprime.times(hm)
                     if keep_loops or (newreactant != newproduct):
                         # we add "_" in front if there is a number
                         # because a reaction id can not start with a number
@@ -1482,8 +1541,8 @@ class CRN(object):
         self.reactions = self.reactions
 
 
-    def _same_denom(self):
-        self.reactions = _same_denom(self.reactions)
+    def _same_denom(self, n_jobs = 1):
+        self.reactions = _same_denom(self.reactions, n_jobs)
 
 
     def _fix_denom(self):
@@ -34,6 +34,85 @@ class Complex(Counter):
      Counts are allowed to be any integer value including zero or negative counts.
      The Counter class is similar to bags or multisets in other languages."
     """
+    def __setitem__(self, key, value):
+        self.__dict__.pop('_frozen_items', None)
+        super(Complex, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.__dict__.pop('_frozen_items', None)
+        super(Complex, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self.__dict__.pop('_frozen_items', None)
+        super(Complex, self).update(*args, **kwargs)
+
+    def clear(self):
+        self.__dict__.pop('_frozen_items', None)
+        super(Complex, self).clear()
+
+    def pop(self, *args):
+        self.__dict__.pop('_frozen_items', None)
+        return super(Complex, self).pop(*args)
+
+    def popitem(self):
+        self.__dict__.pop('_frozen_items', None)
+        return super(Complex, self).popitem()
+
+    def setdefault(self, key, default = None):
+        self.__dict__.pop('_frozen_items', None)
+        return super(Complex, self).setdefault(key, default)
+
+    @property
+    def _frozen(self):
+        """Hashable view of the complex, computed once and
+        discarded whenever the complex is modified.
+
+        :rtype: frozenset of (species, stoichiometry) pairs.
+        """
+        if '_frozen_items' not in self.__dict__:
+            self._frozen_items = frozenset(self.items())
+        return self._frozen_items
+
+    # Arithmetic as in Counter, but returning a Complex built in one step,
+    # so that the result does not need to be copied into a new Complex.
+    def __add__(self, other):
+        if not isinstance(other, Counter): return NotImplemented
+        result = {}
+        for k, v in self.items():
+            v = v + other[k]
+            if v > 0: result[k] = v
+        for k, v in other.items():
+            if k not in self and v > 0: result[k] = v
+        return Complex(result)
+
+    def __sub__(self, other):
+        if not isinstance(other, Counter): return NotImplemented
+        result = {}
+        for k, v in self.items():
+            v = v - other[k]
+            if v > 0: result[k] = v
+        for k, v in other.items():
+            if k not in self and v < 0: result[k] = -v
+        return Complex(result)
+
+    def __and__(self, other):
+        if not isinstance(other, Counter): return NotImplemented
+        result = {}
+        for k, v in self.items():
+            v = min(v, other[k])
+            if v > 0: result[k] = v
+        return Complex(result)
+
+    def __or__(self, other):
+        if not isinstance(other, Counter): return NotImplemented
+        result = {}
+        for k, v in self.items():
+            v = max(v, other[k])
+            if v > 0: result[k] = v
+        for k, v in other.items():
+            if k not in self and v > 0: result[k] = v
+        return Complex(result)
+
     def __str__(self):
         return " + ".join([(str(v) if v != 1 else "") + str(k) for k, v in sorted(self.items())])
 
@@ -2,11 +2,13 @@
 
 """Reaction class and functions."""
 
-from collections import defaultdict
-from functools import reduce
+from collections import defaultdict, namedtuple
+from functools import lru_cache, partial
 from libsbml import formulaToL3String, parseL3Formula
+from scipy.sparse import csr_matrix
 import sympy as sp
 import copy
+import sys
 
 from .crncomplex import Complex
 
@@ -16,6 +18,62 @@ __license__ = "BSD"
 __version__ = "0.0.1"
 
 
+# minimum number of tasks for which a process pool is used
+_PARALLEL_THRESHOLD = 32
+
+
+@lru_cache(maxsize=None)
+def _cached_symbol(s):
+    """Return the sympy symbol for the species s, memoized."""
+    return sp.Symbol(s)
+
+
+@lru_cache(maxsize=4096)
+def _intern_rate(s):
+    """Return the sympy expression for the rate string s, memoized,
+    so that reactions with the same rate string share the expression."""
+    from .parsereaction import parse_expr
+    return parse_expr(s)
+
+
+def _species_degrees(expr, species_syms):
+    """Return, for each species symbol, the largest power
+    of the symbol dividing the polynomial expr.
+
+    :rtype: list of integers.
+    """
+    if not species_syms: return []
+    try:
+        monoms = sp.Poly(expr, *species_syms).monoms()
+    except sp.PolynomialError:
+        # some species appear non-polynomially (e.g. exp(a), a**0.5):
+        # take the integer part of the smallest power of each species
+        # over the terms of expr, 0 if not a positive number
+        degrees = []
+        for ss in species_syms:
+            powers = [sp.sympify(term.as_powers_dict().get(ss, 0)) for term in sp.Add.make_args(expr)]
+            degrees.append(min(int(sp.floor(p)) if p.is_number and p > 0 else 0 for p in powers))
+        return degrees
+    return [min(m[i] for m in monoms) for i in range(len(species_syms))]
+
+
+def _compile_exprs(variables, exprs, backend = "numpy"):
+    """Turn sympy expressions into a numerical function of the given variables.
+
+    With backend = "numpy" the function is created with sympy.lambdify,
+    with backend = "numba" it is also compiled with numba.njit.
+    Requires numba for the numba backend (pip install crnpy[numba])."""
+    # common subexpressions are computed only once
+    f = sp.lambdify([_cached_symbol(v) if isinstance(v, str) else v for v in variables], exprs,
+                    modules = "numpy", cse = True)
+    if backend == "numpy":
+        return f
+    if backend == "numba":
+        import numba
+        return numba.njit(fastmath = True)(f)
+    raise ValueError("Unknown backend {}: use 'numpy' or 'numba'.".format(backend))
+
+
 class Reaction(object):
     """A reaction is defined by a string reactionid,
     a reactant complex, a product complex,
@@ -34,8 +92,11 @@ class Reaction(object):
 
     Attributes: reactionid, reactant, product, rate, kinetic_param.
     """
+    __slots__ = ('_reactionid', '_reactant', '_product', '_Reaction__rate',
+                 '_Reaction__kinetic_param', '_Reaction__numer_denom', '_str_cache')
+
     def __init__(self, reactionid, reactant, product, rate):
-        self._reactionid = reactionid
+        self._reactionid = sys.intern(reactionid) if isinstance(reactionid, str) else reactionid
         self._reactant = reactant
         self._product = product
         self._rate = rate
@@ -43,7 +104,11 @@ class Reaction(object):
     def __copy__(self):
         return Reaction(self.reactionid, self.reactant, self.product, self.rate)
     def __deepcopy__(self, memo):
-        return Reaction(copy.deepcopy(self.reactionid, self.reactant, self.product, self.rate, memo))
+        # sympy expressions are immutable, the rate can be shared
+        return Reaction(self.reactionid,
+                        copy.deepcopy(self.reactant, memo),
+                        copy.deepcopy(self.product, memo),
+                        self.rate)
 
     @property
     def reactionid(self):
@@ -82,8 +147,35 @@ class Reaction(object):
         return self.__rate
     @_rate.setter
     def _rate(self, value):
+        if isinstance(value, str): value = _intern_rate(value)
         self.__rate = value
-        if value is not None: self.__kinetic_param = self.rate / self.reactant.ma()
+        # the kinetic parameter, numerator and denominator
+        # are computed on first access
+        self.__kinetic_param = None
+        self.__numer_denom = None
+        self._str_cache = None
+
+    @property
+    def rate_numer(self):
+        """Numerator of the rate of the reaction.
+
+        :type: sympy expression.
+        """
+        return self._numer_denom[0]
+
+    @property
+    def rate_denom(self):
+        """Denominator of the rate of the reaction.
+
+        :type: sympy expression.
+        """
+        return self._numer_denom[1]
+
+    @property
+    def _numer_denom(self):
+        if self.__numer_denom is None:
+            self.__numer_denom = sp.sympify(self.rate).as_numer_denom()
+        return self.__numer_denom
 
     @property
     def kinetic_param(self):
@@ -96,13 +188,22 @@ class Reaction(object):
 
     @property
     def _kinetic_param(self):
+        if self.__kinetic_param is None and self.rate is not None:
+            self.__kinetic_param = self.rate / self.reactant.ma()
         return self.__kinetic_param
     @_kinetic_param.setter
     def _kinetic_param(self, value):
         self._rate = (value * self.reactant.ma()).cancel()
 
     def __str__(self):
-        return self.format()
+        # the string is cached until the id, the rate
+        # or one of the complexes change
+        cache = self._str_cache
+        if cache is None or cache[0] != self.reactionid or \
+           cache[1] is not self.reactant._frozen or cache[2] is not self.product._frozen:
+            cache = (self.reactionid, self.reactant._frozen, self.product._frozen, self.format())
+            self._str_cache = cache
+        return cache[3]
 
     def  __repr__(self):
         return self.__str__()
@@ -110,8 +211,8 @@ class Reaction(object):
     def __eq__(self, reaction):
         return self.reactant == reaction.reactant and \
                self.product == reaction.product and \
-               (((self.rate - reaction.rate) == 0) or
-                ((self.rate - reaction.rate).cancel() == 0))
+               (self.rate == reaction.rate or
+                sp.together(self.rate - reaction.rate).as_numer_denom()[0].expand() == 0)
 
     def format(self, rate = False, precision = 3):
         """Return a string of the form
@@ -168,6 +269,26 @@ class Reaction(object):
                                      str("\\xrightarrow{" + sp.latex(self.rate if rate else self.kinetic_param) + "}") if self.rate else str("\\rightarrow"),
                                      sp.latex(self.product.symp()))
 
+    def compile_rate(self, species, params = (), backend = "numpy"):
+        """Return a numerical function computing the rate of the reaction.
+        The arguments of the function are the concentrations of the species
+        followed by the values of params, in the given order.
+        By default the function is a plain lambdified function,
+        use backend = "numba" to compile it with numba (requires numba).
+
+        :Example:
+
+        >>> from crnpy.reaction import Reaction
+        >>> from crnpy.crncomplex import Complex
+        >>> r = Reaction("r1", Complex(A = 1, B = 2), Complex(C = 1), "k1*A*B**2")
+        >>> f = r.compile_rate(['A', 'B'], ['k1'])
+        >>> f(1., 2., 0.5)
+        2.0
+
+        :rtype: function.
+        """
+        return _compile_exprs(list(species) + list(params), self.rate, backend)
+
     def remove_react_prod(self, species = None):
         """Remove common species between reactant and product.
 
@@ -182,25 +303,27 @@ class Reaction(object):
         [r0: B ->(A*B*k_r0) , r1: A + B ->(C*k_r1) B + D]
 
         """
-        reactant = Complex(self.reactant)
-        product = Complex(self.product)
         if species == None:
-            common = reactant & product
-            self._reactant = Complex(reactant - common)
-            self._product = Complex(product - common)
+            # Complex operations return new complexes,
+            # the complexes are not modified
+            common = self.reactant & self.product
+            self._reactant = self.reactant - common
+            self._product = self.product - common
         else:
-            if species in reactant and species in product:
-                if reactant[species] > product[species]:
-                    self.reactant[species] = reactant[species] - product[species]
+            if species in self.reactant and species in self.product:
+                r, p = self.reactant[species], self.product[species]
+                if r > p:
+                    self.reactant[species] = r - p
                     del self.product[species]
-                if product[species] > reactant[species]:
-                    self.product[species] = product[species] - reactant[species]
+                elif p > r:
+                    self.product[species] = p - r
                     del self.reactant[species]
-                if reactant[species] == product[species]:
+                else:
                     del self.reactant[species]
                     del self.product[species]
         # Adjust kinetic parameter
         self.__kinetic_param = (self.rate / self.reactant.ma()).cancel()
+        self._str_cache = None
 
 
     def _fix_ma(self, species = None):
@@ -210,22 +333,14 @@ class Reaction(object):
         remainder = self.kinetic_param.as_numer_denom()[0].cancel()
 
         if remainder.func.__name__ == 'Mul':
-            mulargs = list(remainder.args) + [i.args[0] for i in remainder.args if i.func.__name__ == 'Mul'] \
-                                           + [i.args[0] for i in remainder.args if i.func.__name__ == 'Pow']
-            while any(sp.Symbol(s) in mulargs for s in species):
-                for s in species:
-                    if sp.Symbol(s) in mulargs:
-                        if s in self.reactant: self.reactant[s] = self.reactant[s] + 1
-                        else: self.reactant[s] = 1
-                        if s in self.product: self.product[s] = self.product[s] + 1
-                        else: self.product[s] = 1
-                        remainder = (remainder / sp.Symbol(s)).factor()
-                        if remainder.func.__name__ == 'Mul':
-                            mulargs = list(remainder.args) + [i.args[0] for i in remainder.args if i.func.__name__ == 'Mul'] \
-                                                           + [i.args[0] for i in remainder.args if i.func.__name__ == 'Pow']
-                        else: mulargs = []
+            species_syms = [_cached_symbol(s) for s in species]
+            for s, degree in zip(species, _species_degrees(remainder, species_syms)):
+                if degree > 0:
+                    self.reactant[s] = self.reactant[s] + degree
+                    self.product[s] = self.product[s] + degree
             # update the kinetic parameter
             self.__kinetic_param = (self.rate / self.reactant.ma()).cancel()
+            self._str_cache = None
 
 
     def _fix_denom(self, species):
@@ -233,24 +348,14 @@ class Reaction(object):
         if their concentration divides the denominator of the rate."""
         remainder = self.kinetic_param.as_numer_denom()[1].cancel()
 
-        #if remainder.func.__name__ == 'Mul':
         if remainder != 1:
-            mulargs = [remainder] + list(remainder.args) + [i.args[0] for i in remainder.args if i.func.__name__ == 'Mul'] \
-                                                         + [i.args[0] for i in remainder.args if i.func.__name__ == 'Pow']
-            while any(sp.Symbol(s) in mulargs and s in self.reactant and s in self.product for s in species):
-                for s in species:
-                    if sp.Symbol(s) in mulargs and s in self.reactant and s in self.product:
-                        if self.reactant[s] == 1: del self.reactant[s]
-                        else: self.reactant[s] = self.reactant[s] - 1
-                        if self.product[s] == 1: del self.product[s]
-                        else: self.product[s] = self.product[s] - 1
-                        remainder = (remainder / sp.Symbol(s)).factor()
-                        if remainder.func.__name__ == 'Mul':
-                            mulargs = list(remainder.args) + [i.args[0] for i in remainder.args if i.func.__name__ == 'Mul'] \
-                                                           + [i.args[0] for i in remainder.args if i.func.__name__ == 'Pow']
-                        else:
-                            if str(remainder) in species: mulargs = [remainder]
-                            else: mulargs = []
+            species_syms = [_cached_symbol(s) for s in species]
+            for s, degree in zip(species, _species_degrees(remainder, species_syms)):
+                n = min(degree, self.reactant[s], self.product[s])
+                if n > 0:
+                    for c in (self.reactant, self.product):
+                        if c[s] == n: del c[s]
+                        else: c[s] = c[s] - n
         # update the kinetic parameter
         self._kinetic_param = self.rate / self.reactant.ma()
 
@@ -261,7 +366,7 @@ def _split_reaction(reaction):
 
     :rtype: list of Reactions.
     """
-    ratenumer, ratedenom = reaction.rate.as_numer_denom()
+    ratenumer, ratedenom = reaction.rate_numer, reaction.rate_denom
     ratenumer = ratenumer.expand()
     if ratenumer.func.__name__ == 'Add':
         reactions = []
@@ -283,17 +388,12 @@ def _split_reaction_monom(reaction, species):
     :rtype: list of Reactions.
     """
     ratenumer, ratedenom = reaction.rate.cancel().as_numer_denom()
-    ratenumer = ratenumer.expand()
-    species = map(sp.Symbol, species)
-    ratendict = sp.Poly(ratenumer, *species).as_dict()
-    if len(ratendict) > 1:
+    ratenparts = _monom_parts(ratenumer, [_cached_symbol(s) for s in species])
+    if len(ratenparts) > 1:
         reactions = []
 
-        i = 0
-        for degrees in ratendict:
-            i = i + 1
-            ratenpart = sp.Mul(*[species[r]**degrees[r] for r in range(len(species))]) * ratendict[degrees]
-            reactions.append(Reaction(reaction.reactionid + "_" + str(i), \
+        for i, ratenpart in enumerate(ratenparts):
+            reactions.append(Reaction(reaction.reactionid + "_" + str(i + 1), \
                                       reaction.reactant, \
                                       reaction.product, \
                                       ratenpart / ratedenom))
@@ -301,6 +401,19 @@ def _split_reaction_monom(reaction, species):
     return [reaction]
 
 
+def _monom_parts(numer, species_syms):
+    """Split numer into the sum of its monomials in the species symbols.
+
+    :rtype: list of sympy expressions.
+    """
+    try:
+        return [sp.Monomial(monom, species_syms).as_expr() * coeff
+                for monom, coeff in sp.Poly(numer, *species_syms).terms()]
+    except sp.PolynomialError:
+        # species appearing non-polynomially (e.g. a**n): split on the terms of the numerator
+        return list(sp.Add.make_args(numer.expand()))
+
+
 def merge_reactions(reactions):
     """Merge reactions with same reactants and products.
 
@@ -322,28 +435,42 @@ def merge_reactions(reactions):
     react = defaultdict(list)
     newreactions = []
     for reaction in reactions:
-        react[(tuple(sorted(reaction.reactant.items())), tuple(sorted(reaction.product.items())))].append(reaction)
-    for c in react:
-        if react[c][0].reactant != react[c][0].product:
-            newreactions.append(Reaction(''.join([reaction.reactionid for reaction in react[c]]), \
-                                         react[c][0].reactant, \
-                                         react[c][0].product, \
-                                         sum([reaction.rate for reaction in react[c]]).factor()))
+        react[(reaction.reactant._frozen, reaction.product._frozen)].append(reaction)
+    groups = [group for group in react.values() if group[0].reactant != group[0].product]
+    for group in groups:
+        newreactions.append(Reaction(''.join([reaction.reactionid for reaction in group]), \
+                                     group[0].reactant, \
+                                     group[0].product, \
+                                     _merge_rates([reaction.rate for reaction in group])))
     return sorted(newreactions, key = lambda r: r.reactionid)
 
 
-def _same_denom(reactions):
+def _merge_rates(rates):
+    """Sum the rates of reactions with same reactant and product."""
+    # a single n-ary Add instead of a left fold of pairwise sums
+    return sp.factor_terms(sp.Add(*rates))
+
+
+def _same_denom(reactions, n_jobs = 1):
     """Change the rates so that they all have the same denominator.
+    If n_jobs is not 1, the factors multiplying the denominators
+    of large networks are computed using a pool of n_jobs processes
+    (all processors if n_jobs is None or negative). Each factor
+    requires cancelling a fraction of the common denominator,
+    so this only pays off for many large denominators.
 
     :rtype: list of Reactions.
     """
-    numers, denoms = zip(*[reaction.rate.as_numer_denom() for reaction in reactions])
-    commondenom = reduce(sp.lcm, denoms)
+    numers, denoms = zip(*[(reaction.rate_numer, reaction.rate_denom) for reaction in reactions])
+    commondenom = sp.lcm_list(denoms)
+    # cofactor of each distinct denominator, None if it equals commondenom
+    distinct = list(dict.fromkeys(denoms))
+    cofactors = dict(zip(distinct, _parallel_map(partial(_cofactor, commondenom = commondenom), distinct, n_jobs)))
     newreactions = []
     for r in range(len(reactions)):
         reaction = reactions[r]
-        if (denoms[r] - commondenom).cancel() != 0:
-            diff = (commondenom / denoms[r]).cancel().expand()
+        diff = cofactors[denoms[r]]
+        if diff is not None:
             if diff.func.__name__ == 'Add':
                 rateadds = list(diff.args)
                 for ra in range(len(rateadds)):
@@ -360,6 +487,169 @@ def _same_denom(reactions):
     return newreactions
 
 
+def _cofactor(denom, commondenom):
+    """Return commondenom / denom, or None if they are equal."""
+    if denom == commondenom or (denom - commondenom).cancel() == 0:
+        return None
+    return (commondenom / denom).cancel().expand()
+
+
+def _parallel_map(func, args, n_jobs = 1):
+    """Apply func to each element of args, using a pool of n_jobs processes
+    (all processors if n_jobs is None or negative) when n_jobs is not 1
+    and there are more than _PARALLEL_THRESHOLD elements.
+
+    :rtype: list.
+    """
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a positive integer, negative or None.")
+    if n_jobs == 1 or len(args) <= _PARALLEL_THRESHOLD:
+        return [func(a) for a in args]
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = None
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers = n_jobs) as executor:
+        return list(executor.map(func, args, chunksize = 8))
+
+
+# reaction with rate numer / denom, used by preprocess_network
+_Term = namedtuple('_Term', ['reactionid', 'reactant', 'product', 'numer', 'denom'])
+
+
+def preprocess_network(reactions, species, split = 'monom', merge = True, same_denom = True):
+    """Split the reactions, merge them and change their rates
+    so that they have the same denominator, in a single pass.
+
+    This gives the same network as applying _split_reaction_monom
+    (split = 'monom') or _split_reaction (split = 'add'), then
+    merge_reactions and _same_denom, with rates possibly written
+    in a different form. The intermediate steps only handle numerators
+    and denominators, and Reactions are created only at the end.
+    Use split = None to skip the splitting.
+
+    :rtype: list of Reactions.
+    """
+    species_syms = [_cached_symbol(s) for s in species]
+
+    # split
+    terms = []
+    for reaction in reactions:
+        if split == 'monom':
+            numer, denom = sp.sympify(reaction.rate).cancel().as_numer_denom()
+            parts = _monom_parts(numer, species_syms)
+            ids = [reaction.reactionid + "_" + str(i + 1) for i in range(len(parts))]
+        elif split == 'add':
+            numer, denom = reaction.rate_numer.expand(), reaction.rate_denom
+            parts = list(numer.args) if numer.func.__name__ == 'Add' else [numer]
+            ids = [reaction.reactionid + "_" + str(i) for i in range(len(parts))]
+        elif split is None:
+            parts, denom = [reaction.rate_numer], reaction.rate_denom
+        else:
+            raise ValueError("Unknown split {}: use 'monom', 'add' or None.".format(split))
+        if len(parts) == 1: ids = [reaction.reactionid]
+        terms.extend(_Term(rid, reaction.reactant, reaction.product, part, denom)
+                     for rid, part in zip(ids, parts))
+
+    # merge
+    if merge:
+        groups = defaultdict(list)
+        for term in terms:
+            groups[(term.reactant._frozen, term.product._frozen)].append(term)
+        terms = []
+        for group in groups.values():
+            if group[0].reactant == group[0].product: continue
+            if all(term.denom == group[0].denom for term in group):
+                numer, denom = sp.factor_terms(sp.Add(*[term.numer for term in group])), group[0].denom
+            else:
+                numer, denom = _merge_rates([term.numer / term.denom for term in group]).as_numer_denom()
+            terms.append(_Term(''.join([term.reactionid for term in group]),
+                               group[0].reactant, group[0].product, numer, denom))
+        terms.sort(key = lambda t: t.reactionid)
+
+    # same denominator
+    if same_denom and terms:
+        commondenom = sp.lcm_list([term.denom for term in terms])
+        distinct = list(dict.fromkeys(term.denom for term in terms))
+        cofactors = dict((denom, _cofactor(denom, commondenom)) for denom in distinct)
+        newterms = []
+        for term in terms:
+            diff = cofactors[term.denom]
+            if diff is None:
+                newterms.append(term)
+            elif diff.func.__name__ == 'Add':
+                newterms.extend(_Term(term.reactionid + "_" + str(ra), term.reactant, term.product,
+                                      part * term.numer, commondenom)
+                                for ra, part in enumerate(diff.args))
+            else:
+                newterms.append(term._replace(numer = diff * term.numer, denom = commondenom))
+        terms = newterms
+
+    return [Reaction(term.reactionid, term.reactant, term.product, term.numer / term.denom) for term in terms]
+
+
+def batch_simplify(reactions):
+    """Simplify the rates of the reactions, cancelling
+    each distinct rate only once.
+
+    :Example:
+
+    >>> from crnpy.parsereaction import parse_reactions
+    >>> from crnpy.reaction import batch_simplify
+    >>> reacts = parse_reactions(["a ->(k1*(a**2 - 1)/(a - 1)) b", "b ->(k2*(a**2 - 1)) c"], rate = True)
+    >>> batch_simplify(reacts)
+    [r0: a ->(k1*(a + 1)/a) b, r1: b ->(k2*(a**2 - 1)/b) c]
+
+    :rtype: list of Reactions.
+    """
+    cancelled = {}
+    simplified = []
+    for reaction in reactions:
+        rate = sp.sympify(reaction.rate)
+        if rate not in cancelled:
+            cancelled[rate] = sp.factor_terms(sp.cancel(rate))
+        simplified.append(Reaction(reaction.reactionid, \
+                                   reaction.reactant, \
+                                   reaction.product, \
+                                   cancelled[rate]))
+    return simplified
+
+
+def build_stoich_matrices(reactions, species):
+    """Return the sparse matrices of the stoichiometric coefficients
+    of the reactants and of the products of the reactions.
+
+    Both matrices have dimension number of species times number of reactions,
+    the element at position ij being the stoichiometric coefficient
+    of the i-th species in the reactant (respectively product)
+    of the j-th reaction. Their difference is the stoichiometric matrix.
+
+    :Example:
+
+    >>> from crnpy.parsereaction import parse_reactions
+    >>> from crnpy.reaction import build_stoich_matrices
+    >>> reacts = parse_reactions(["A1 -> A2 + A3", "A2 -> 2 A3"])
+    >>> s_in, s_out = build_stoich_matrices(reacts, ['A1', 'A2', 'A3'])
+    >>> (s_out - s_in).toarray()
+    array([[-1,  0],
+           [ 1, -1],
+           [ 1,  2]])
+
+    :rtype: pair of scipy csr_matrix.
+    """
+    index = dict((s, i) for i, s in enumerate(species))
+    shape = (len(species), len(reactions))
+    matrices = []
+    for side in ("reactant", "product"):
+        rows, cols, data = [], [], []
+        for j, reaction in enumerate(reactions):
+            for s, v in getattr(reaction, side).items():
+                rows.append(index[s])
+                cols.append(j)
+                data.append(v)
+        matrices.append(csr_matrix((data, (rows, cols)), shape = shape, dtype = int))
+    return tuple(matrices)
+
+
 def translate(reaction, c):
     """Translate the reaction by c.
     Return the reaction (r + Id_c), where c has been added to both reactant and product.
@@ -372,7 +662,7 @@ def translate(reaction, c):
     :rtype: Reaction.
     """
     rid = reaction.reactionid + "_" + str(c).replace(" ", "").replace("+", "_").replace("-", "m")
-    return Reaction(rid, Complex(reaction.reactant + c), Complex(reaction.product + c), reaction.rate)
+    return Reaction(rid, reaction.reactant + c, reaction.product + c, reaction.rate)
 
 
 def reaction_path(reactions):
@@ -381,10 +671,31 @@ def reaction_path(reactions):
 
     :rtype: list of Reactions.
     """
-    additions = [reduce(lambda a, b: a + b,
-                        [reactions[i].product for i in range(h)] +
-                        [reactions[i].reactant for i in range(h+1, len(reactions))])
-                 for h in range(len(reactions))]
-    c = Complex(reduce(lambda a, b: a & b, additions))
-    additions = [Complex(additions[h]-c) for h in range(len(additions))]
-    return [translate(reactions[h], additions[h]) for h in range(len(reactions))], additions
+    n = len(reactions)
+    if n == 0: return [], []
+    # products of the reactions before h, and reactants of the reactions after h
+    prefix = [Complex()]
+    for h in range(n - 1):
+        prefix.append(prefix[h] + reactions[h].product)
+    suffix = [Complex()]
+    for h in range(n - 1, 0, -1):
+        suffix.append(suffix[-1] + reactions[h].reactant)
+    suffix.reverse()
+    additions = [prefix[h] + suffix[h] for h in range(n)]
+    c = _intersection(additions)
+    additions = [additions[h] - c for h in range(n)]
+    return [translate(reactions[h], additions[h]) for h in range(n)], additions
+
+
+def _intersection(complexes):
+    """Return the complex with stoichiometric coefficients
+    the minimum of those in the complexes, as in Complex & Complex,
+    in a single pass over the species of the first complex.
+
+    :rtype: Complex.
+    """
+    common = Complex()
+    for s in complexes[0]:
+        m = min(c[s] for c in complexes)
+        if m > 0: common[s] = m
+    return common
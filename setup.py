@@ -23,21 +23,25 @@ setup(
         'Intended Audience :: Science',
         'Intended Audience :: Research',
         'License :: BSD',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.6',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
     ],
 
     keywords='chemical reaction networks',
 
     packages=find_packages(exclude=['tests']),
 
+    python_requires='>=3.7',
+
     # run-time dependencies that will be installed by pip
     install_requires=['python-libsbml', 'numpy', 'scipy',
-                      'sympy', 'pycddlib', 'pulp', 'matplotlib'],
+                      'sympy>=1.9', 'pycddlib', 'pulp', 'matplotlib'],
+
+    # optional dependencies, e.g. pip install crnpy[numba]
+    extras_require={
+        'numba': ['numba'],
+    },
 )
 
@@ -56,6 +56,28 @@ class TestComplex(unittest.TestCase):
         self.assertFalse(Complex({'a': 1, 'b': 1}) <= Complex({'a': 1, 'c': 3}))
 
 
+    def test_arithmetic(self):
+        c1, c2 = Complex({'a': 2, 'b': 1}), Complex({'a': 1, 'c': 3})
+        for c, expected in [(c1 + c2, Complex({'a': 3, 'b': 1, 'c': 3})),
+                            (c1 - c2, Complex({'a': 1, 'b': 1})),
+                            (c1 & c2, Complex({'a': 1})),
+                            (c1 | c2, Complex({'a': 2, 'b': 1, 'c': 3})),
+                            (c1 + Complex({'a': -2}), Complex({'b': 1}))]:
+            self.assertIsInstance(c, Complex)
+            self.assertEqual(c, expected)
+
+
+    def test_frozen(self):
+        c = Complex({'a': 1, 'b': 2})
+        self.assertEqual(c._frozen, frozenset([('a', 1), ('b', 2)]))
+        c['a'] = 3
+        self.assertEqual(c._frozen, frozenset([('a', 3), ('b', 2)]))
+        del c['b']
+        self.assertEqual(c._frozen, frozenset([('a', 3)]))
+        c.update({'s': 1})
+        self.assertEqual(c._frozen, Complex({'a': 3, 's': 1})._frozen)
+
+
 if __name__ == "__main__":
     suite = unittest.TestLoader().loadTestsFromTestCase(TestComplex)
     unittest.TextTestRunner(verbosity=2).run(suite)
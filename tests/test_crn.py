@@ -5,6 +5,7 @@
 import unittest
 
 from filecmp import cmp
+from importlib.util import find_spec
 import libsbml
 import sympy as sp
 from os import path
@@ -126,6 +127,13 @@ class TestCrn(unittest.TestCase):
         self.assertEqual(sp.Matrix([parse_expr("k_r0*A"), parse_expr("k_r1*B"), parse_expr("k_r1_rev*C*D")]), net.rates)
         S = sp.Matrix([[-1,  0,  0], [ 2, -1,  1], [ 0,  1, -1], [ 0,  1, -1]])
         self.assertEqual(S, net.stoich_matrix)
+        self.assertEqual(S, sp.Matrix(net.sparse_stoich_matrix.toarray()))
+        s_in, s_out = net.sparse_stoich_matrices
+        self.assertEqual([[1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 0, 1]], s_in.toarray().tolist())
+        reactions = net.reactions
+        net.reactions = reactions[:2]
+        self.assertEqual(S[:, :2], sp.Matrix(net.sparse_stoich_matrix.toarray()))
+        net.reactions = reactions
         Y = sp.Matrix([[1, 0, 0, 0], [0, 2, 1, 0], [0, 0, 0, 1], [0, 0, 0, 1]])
         self.assertEqual(Y, net.complex_matrix)
         Ia = sp.Matrix([[-1,  0,  0], [ 1,  0,  0], [ 0, -1,  1], [ 0,  1, -1]])
@@ -493,6 +501,20 @@ class TestCrn(unittest.TestCase):
         self.assertEqual(str(crn.reactions[3]), "r0_rev: a + c ->(2.5e+15/d) d")
 
 
+    def test_compile_rates(self):
+        crn = from_react_strings(["a + b ->(k1) c", "c ->(k2/(1 + a)) "])
+        f = crn.compile_rates(['k1', 'k2'])
+        self.assertEqual(tuple(f(1., 2., 3., 0.5, 4.)), (1., 6.))
+        self.assertRaises(ValueError, crn.compile_rates, ['k1', 'k2'], 'c')
+
+
+    @unittest.skipUnless(find_spec("numba"), "numba not installed")
+    def test_compile_rates_numba(self):
+        crn = from_react_strings(["a + b ->(k1) c", "c ->(k2/(1 + a)) "])
+        f = crn.compile_rates(['k1', 'k2'], backend = "numba")
+        self.assertEqual(tuple(f(1., 2., 3., 0.5, 4.)), (1., 6.))
+
+
 if __name__ == "__main__":
     suite = unittest.TestLoader().loadTestsFromTestCase(TestCrn)
     unittest.TextTestRunner(verbosity=2).run(suite)
@@ -2,6 +2,8 @@
 
 """Tests for Reaction class."""
 
+import copy
+from importlib.util import find_spec
 from os import path
 import unittest
 
@@ -9,7 +11,8 @@ import unittest
 from crnpy.crn import CRN, from_react_file
 from crnpy.crncomplex import Complex
 from crnpy.parsereaction import parse_reactions, parse_complex, parse_reaction, parse_expr
-from crnpy.reaction import Reaction, translate
+from crnpy.reaction import Reaction, translate, batch_simplify, merge_reactions, preprocess_network, reaction_path, \
+                           _same_denom, _split_reaction_monom
 from .test_reduction import eqs_match
 
 __author__ = "Elisa Tonello"
@@ -67,6 +70,17 @@ class TestReaction(unittest.TestCase):
         self.assertEqual(r.format(True, precision = 1), "r_123: A + 2B ->(1.2e-4*A*B**2) B + 3C")
 
 
+    def test_str_cache(self):
+        r = parse_reactions(["a + 2b ->(k1) a + b"])[0]
+        self.assertEqual(str(r), "r0: a + 2b ->(k1) a + b")
+        r.remove_react_prod()
+        self.assertEqual(str(r), "r0: b ->(a*b*k1) ")
+        r.reactant['c'] = 1
+        self.assertEqual(str(r), "r0: b + c ->(a*b*k1) ")
+        r._rate = parse_expr("k2*b*c")
+        self.assertEqual(str(r), "r0: b + c ->(k2) ")
+
+
     def test_merge(self):
         crn = from_react_file(path.join(input_folder, "test_merge"))
         origspecies = crn.species
@@ -81,6 +95,13 @@ class TestReaction(unittest.TestCase):
         self.assertEqual(eqs_match(origeqs, origspecies, crn.removed_species, crn.equations(), crn.species), 0)
 
 
+    def test_same_denom_parallel(self):
+        reacts = parse_reactions(["a{0} ->(k{0}/(c + {0})) b{0}".format(i) for i in range(40)], rate = True)
+        self.assertEqual(_same_denom(reacts), _same_denom(reacts, n_jobs = 2))
+        self.assertEqual(_same_denom(reacts), _same_denom(reacts, n_jobs = -1))
+        self.assertRaises(ValueError, _same_denom, reacts, n_jobs = 0)
+
+
     def test_remove_react_prod(self):
         reaction = parse_reactions(["5 a + b + 2 c -> 3 a + 2 b + d"])[0]
         print(reaction)
@@ -115,6 +136,94 @@ class TestReaction(unittest.TestCase):
         self.assertEqual(reaction.reactant, Complex({"a": 1, "d": 1}))
         self.assertEqual(reaction.product, Complex({"c": 1}))
 
+        # b does not divide the denominator
+        reaction = parse_reactions(["a + b ->(k1/(b*k2 + k4)) b + p"])[0]
+        reaction._fix_denom(['a', 'b', 'p'])
+        self.assertEqual(reaction.reactant, Complex({"a": 1, "b": 1}))
+        self.assertEqual(reaction.product, Complex({"b": 1, "p": 1}))
+
+        # the rate is cancelled
+        reaction = parse_reactions(["a + b ->(k*a*b*(c + 1)/(a*(c**2 - 1))) a + p"], rate = True)[0]
+        reaction._fix_denom(['a', 'b', 'c', 'p'])
+        self.assertEqual(str(reaction), "r0: b ->(k/(c - 1)) p")
+        reaction = parse_reactions(["a ->(k*(a**2 - 1)/(a - 1)) b"], rate = True)[0]
+        reaction._fix_denom(['a', 'b'])
+        self.assertEqual(reaction.rate, parse_expr('a*k + k'))
+
+        # non-polynomial denominators
+        reaction = parse_reactions(["a + b ->(k*a/(1 + exp(a))) a + p"], rate = True)[0]
+        reaction._fix_denom(['a', 'b', 'p'])
+        self.assertEqual(reaction.reactant, Complex({"a": 1, "b": 1}))
+        self.assertEqual(reaction.product, Complex({"a": 1, "p": 1}))
+        reaction = parse_reactions(["a + b ->(k*a*b/(K + a**0.5)) a + p"], rate = True)[0]
+        reaction._fix_denom(['a', 'b', 'p'])
+        self.assertEqual(reaction.reactant, Complex({"a": 1, "b": 1}))
+        reaction = parse_reactions(["2a + b ->(k*a**2*b/(a*(K + a**0.5))) a + p"], rate = True)[0]
+        reaction._fix_denom(['a', 'b', 'p'])
+        self.assertEqual(reaction.reactant, Complex({"a": 1, "b": 1}))
+        self.assertEqual(reaction.product, Complex({"p": 1}))
+
+
+    def test_split_reaction_monom(self):
+        reaction = parse_reactions(["a ->(k1*a*b + k2*b**2/(a + 1)) c"], rate = True)[0]
+        reactions = _split_reaction_monom(reaction, ['a', 'b', 'c'])
+        self.assertEqual(len(reactions), 3)
+        self.assertEqual(sum(r.rate for r in reactions).cancel(), reaction.rate.cancel())
+        self.assertEqual([reaction], _split_reaction_monom(reaction, ['c']))
+        reaction = parse_reactions(["a ->(k1*a**n/(K + a**n) + k2) c"], rate = True)[0]
+        reactions = _split_reaction_monom(reaction, ['a', 'c'])
+        self.assertEqual(len(reactions), 3)
+        self.assertEqual(sum(r.rate for r in reactions).cancel(), reaction.rate.cancel())
+
+
+    def test_compile_rate(self):
+        r = Reaction('r1', Complex(A = 1, B = 2), Complex(C = 1), parse_expr('k1*A*B**2/(A + k2)'))
+        f = r.compile_rate(['A', 'B'], ['k1', 'k2'])
+        self.assertEqual(f(1., 2., 3., 1.), 6.)
+
+
+    @unittest.skipUnless(find_spec("numba"), "numba not installed")
+    def test_compile_rate_numba(self):
+        r = Reaction('r1', Complex(A = 1, B = 2), Complex(C = 1), parse_expr('k1*A*B**2/(A + k2)'))
+        f = r.compile_rate(['A', 'B'], ['k1', 'k2'], backend = "numba")
+        self.assertEqual(f(1., 2., 3., 1.), 6.)
+
+
+    def test_deepcopy(self):
+        r = parse_reactions(["a + 2b ->(k1/(k2 + a)) 3c"])[0]
+        r_copy = copy.deepcopy(r)
+        self.assertEqual(r, r_copy)
+        r_copy.reactant['a'] = 2
+        self.assertEqual(r.reactant, Complex({'a': 1, 'b': 2}))
+
+
+    def test_rate_string(self):
+        r1 = Reaction('r1', Complex(A = 1), Complex(C = 1), 'k1*A*E')
+        r2 = Reaction('r2', Complex(A = 1), Complex(B = 1), 'k1*A*E')
+        self.assertEqual(r1.rate, parse_expr('k1*A*E'))
+        self.assertIs(r1.rate, r2.rate)
+
+
+    def test_numer_denom(self):
+        r = Reaction('r1', Complex(A = 1), Complex(C = 1), parse_expr('k1*A/(k2 + A)'))
+        self.assertEqual((r.rate_numer, r.rate_denom), (parse_expr('k1*A'), parse_expr('k2 + A')))
+        r._rate = parse_expr('k1*A')
+        self.assertEqual((r.rate_numer, r.rate_denom), (parse_expr('k1*A'), 1))
+
+
+    def test_batch_simplify(self):
+        reacts = parse_reactions(["a ->(k1*a/(a**2 + a*b) + k2) b", "b ->(k3/(a + b) + k2) c", "c ->(k4*c) a"], rate = True)
+        simplified = batch_simplify(reacts)
+        self.assertEqual(reacts, simplified)
+        self.assertEqual(simplified[2].rate, parse_expr('k4*c'))
+        self.assertEqual([], batch_simplify([]))
+
+        # cancellations across common subexpressions
+        reacts = parse_reactions(["a ->(k1*(a**2 - 1)/(a - 1)) b", "b ->(k2*(a**2 - 1)) c"], rate = True)
+        simplified = batch_simplify(reacts)
+        self.assertEqual(simplified[0].rate, parse_expr('k1*(a + 1)'))
+        self.assertEqual((simplified[1].rate - parse_expr('k2*(a**2 - 1)')).expand(), 0)
+
 
     def test_translate(self):
         r = Reaction('', parse_complex('x1 + x2'), parse_complex('2x1 + x3'), parse_expr('k*x1*x2'))
@@ -123,6 +232,40 @@ class TestReaction(unittest.TestCase):
         self.assertEqual(r2, translate(r, Complex({'x1': -1, 'x4': 1})))
 
 
+    def test_same_denom(self):
+        reacts = parse_reactions(["a ->(k1/(a + b)) b", "b ->(k2/((a + b)*(c + 1))) c", "c ->(k3/(a + b)) a"], rate = True)
+        newreacts = _same_denom(reacts)
+        self.assertEqual(len(set(r.rate_denom.expand() for r in newreacts)), 1)
+        for reaction in reacts:
+            rate = sum(r.rate for r in newreacts if r.reactant == reaction.reactant and r.product == reaction.product)
+            self.assertEqual((rate - reaction.rate).cancel(), 0)
+
+
+    def test_preprocess_network(self):
+        reacts = parse_reactions(["a ->(k1*a + k2*a*b/(c + 1)) b", "a ->(k3) b", "b + c ->(k4/(c + 2)) a",
+                                  "c ->(k5*c + k6) c", "b ->(k7*b*(c + 1)) c"], rate = True)
+        species = ['a', 'b', 'c']
+        split = [r for reaction in reacts for r in _split_reaction_monom(reaction, species)]
+        self.assertEqual(_same_denom(merge_reactions(split)), preprocess_network(reacts, species))
+        self.assertEqual(merge_reactions(reacts), preprocess_network(reacts, species, split = None, same_denom = False))
+        self.assertRaises(ValueError, preprocess_network, reacts, species, 'x')
+
+        # non-polynomial rates
+        reacts = parse_reactions(["a ->(k1*a**n/(K + a**n) + k2) c", "c ->(k3*exp(a)) a"], rate = True)
+        species = ['a', 'c']
+        split = [r for reaction in reacts for r in _split_reaction_monom(reaction, species)]
+        self.assertEqual(_same_denom(merge_reactions(split)), preprocess_network(reacts, species))
+
+
+    def test_reaction_path(self):
+        reacts = parse_reactions(["a + b -> c", "c + d -> 2e", "e -> a + f"])
+        path, additions = reaction_path(reacts)
+        self.assertEqual(additions, [Complex(d = 1), Complex(), Complex(e = 1)])
+        self.assertEqual([r.reactant for r in path], [parse_complex('a + b + d'), parse_complex('c + d'), parse_complex('2e')])
+        for h in range(len(path) - 1):
+            self.assertEqual(path[h].product, path[h + 1].reactant)
+
+
 if __name__ == "__main__":
     suite = unittest.TestLoader().loadTestsFromTestCase(TestReaction)
     unittest.TextTestRunner(verbosity=2).run(suite)